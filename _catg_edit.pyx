@@ -0,0 +1,202 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional C accelerator for rorb_catg_edit.
+
+Mirrors the pure-Python edit loop in rorb_catg_edit.py: scan a .catg file
+once, replace one field in every NODES record or REACHES header of the
+target section, and leave every other byte untouched. Build with:
+
+    python3 setup.py build_ext --inplace
+
+rorb_catg_edit.py falls back to its pure-Python loop when this module is
+not built, so building it is never required - only faster.
+"""
+
+# Section kinds; must match _IN_NODES / _IN_REACHES in rorb_catg_edit.py
+NODES = 1
+REACHES = 2
+
+# More tokens than any real .catg record line carries
+DEF MAX_TOKENS = 64
+
+
+cdef inline bint _is_ws(unsigned char c):
+    return c == 32 or c == 9  # space or tab
+
+
+cdef bint _is_int(const unsigned char* s, Py_ssize_t a, Py_ssize_t b):
+    """True if s[a:b] is an optionally signed run of digits."""
+    if a >= b:
+        return False
+    if s[a] == 45 or s[a] == 43:  # '-' or '+'
+        a += 1
+        if a >= b:
+            return False
+    while a < b:
+        if s[a] < 48 or s[a] > 57:
+            return False
+        a += 1
+    return True
+
+
+cdef bint _is_num(const unsigned char* s, Py_ssize_t a, Py_ssize_t b):
+    """True if s[a:b] looks like a decimal number with optional exponent."""
+    cdef bint seen_digit = False
+    cdef bint seen_dot = False
+    if a >= b:
+        return False
+    if s[a] == 45 or s[a] == 43:
+        a += 1
+    while a < b:
+        if 48 <= s[a] <= 57:
+            seen_digit = True
+        elif s[a] == 46 and not seen_dot:  # '.'
+            seen_dot = True
+        elif (s[a] == 101 or s[a] == 69) and seen_digit:  # 'e' / 'E'
+            a += 1
+            if a < b and (s[a] == 45 or s[a] == 43):
+                a += 1
+            if a >= b:
+                return False
+            while a < b:
+                if s[a] < 48 or s[a] > 57:
+                    return False
+                a += 1
+            return True
+        else:
+            return False
+        a += 1
+    return seen_digit
+
+
+def edit_stream(bytes content, int token_index, bytes new_value,
+                int section_kind):
+    """
+    Apply one field edit to every record of the target section.
+
+    Args:
+        content: Entire file as bytes
+        token_index: 0-based token index after 'C'
+        new_value: Replacement value (no whitespace)
+        section_kind: NODES or REACHES
+
+    Returns:
+        (edited_content, modified_count)
+
+    Raises:
+        ValueError: If the new value doesn't fit in a field's span
+    """
+    cdef const unsigned char* buf = content
+    cdef Py_ssize_t n = len(content)
+    cdef Py_ssize_t pos = 0, end, next_pos, eol, i, j
+    cdef Py_ssize_t tok_start[MAX_TOKENS]
+    cdef Py_ssize_t tok_end[MAX_TOKENS]
+    cdef int ntok
+    cdef int state = 0
+    cdef int coords_remaining = 0
+    cdef int modified = 0
+    cdef long line_num = 0
+    cdef Py_ssize_t span_start, span_end
+    cdef Py_ssize_t vlen = len(new_value)
+    cdef bint is_record
+
+    out = bytearray()
+
+    while pos < n:
+        line_num += 1
+        eol = content.find(b'\n', pos)
+        if eol < 0:
+            next_pos = n
+            end = n
+        else:
+            next_pos = eol + 1
+            end = eol
+            if end > pos and buf[end - 1] == 13:  # '\r'
+                end -= 1
+
+        edited = None
+
+        # Section headers start with 'C #'; they are never records
+        if end - pos >= 3 and buf[pos] == 67 and buf[pos + 1] == 32 \
+                and buf[pos + 2] == 35:
+            seg = content[pos:end]
+            if seg.startswith(b'C #NODES'):
+                state = NODES
+            elif seg.startswith(b'C #REACHES'):
+                state = REACHES
+            else:
+                state = 0
+            coords_remaining = 0
+
+        elif state == section_kind:
+            if section_kind == REACHES and coords_remaining > 0:
+                # Coordinate line following a reach header - skip it
+                coords_remaining -= 1
+            elif end - pos >= 6 and buf[pos] == 67 and buf[pos + 1] == 32:
+                # Tokenize the line after 'C'
+                ntok = 0
+                i = pos + 1
+                while i < end and ntok < MAX_TOKENS:
+                    while i < end and _is_ws(buf[i]):
+                        i += 1
+                    if i >= end:
+                        break
+                    j = i
+                    while j < end and not _is_ws(buf[j]):
+                        j += 1
+                    tok_start[ntok] = i
+                    tok_end[ntok] = j
+                    ntok += 1
+                    i = j
+
+                if section_kind == NODES:
+                    # Node record: integer NodeNo, numeric X and Y
+                    is_record = (ntok >= 3
+                                 and _is_int(buf, tok_start[0], tok_end[0])
+                                 and _is_num(buf, tok_start[1], tok_end[1])
+                                 and _is_num(buf, tok_start[2], tok_end[2]))
+                else:
+                    # Reach header: >= 10 tokens, integer ReachNo and Ncoords
+                    is_record = (ntok >= 10
+                                 and _is_int(buf, tok_start[0], tok_end[0])
+                                 and _is_int(buf, tok_start[9], tok_end[9]))
+
+                if is_record and section_kind == REACHES:
+                    # Expect 2 coordinate lines after every detected
+                    # header, edited or not - same as the pure-Python loop
+                    coords_remaining = 2
+
+                if is_record and token_index < ntok:
+                    span_start = tok_start[token_index] - pos
+                    if token_index + 1 < ntok:
+                        span_end = tok_start[token_index + 1] - pos
+                    else:
+                        span_end = end - pos
+                    if vlen > span_end - span_start:
+                        raise ValueError(
+                            f"New value '{new_value.decode('utf-8', 'replace')}' "
+                            f"(length {vlen}) doesn't fit in span of width "
+                            f"{span_end - span_start} on line {line_num}"
+                        )
+                    line = content[pos:end]
+                    if vlen == 1:
+                        # Overwrite only the old token's bytes; padding
+                        # after it is preserved exactly
+                        tok_e = tok_end[token_index] - pos
+                        edited = (line[:span_start] + new_value
+                                  + b' ' * (tok_e - span_start - 1)
+                                  + line[tok_e:])
+                    else:
+                        edited = (line[:span_start] + new_value
+                                  + b' ' * (span_end - span_start - vlen)
+                                  + line[span_end:])
+                    modified += 1
+
+        if edited is None:
+            out += content[pos:next_pos]
+        else:
+            out += edited
+            out += content[end:next_pos]
+        pos = next_pos
+
+    return bytes(out), modified
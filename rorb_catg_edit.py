@@ -23,14 +23,29 @@ Author: Claude Code
 """
 
 import argparse
-import sys
+import glob
+import mmap
+import os
 import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import List, Tuple, Optional
 
+# Optional C accelerator built from _catg_edit.pyx (see setup.py); the
+# pure-Python loop below is used whenever it is not built
+try:
+    import _catg_edit
+except ImportError:
+    _catg_edit = None
+
 
 # Field definitions for NODES and REACHES blocks
 # Format: (field_name, token_index_after_C)
-NODES_FIELDS = {
+# Wrapped in MappingProxyType so the tables are read-only constants
+NODES_FIELDS = MappingProxyType({
     'NodeNo': 0,
     'X': 1,
     'Y': 2,
@@ -43,9 +58,9 @@ NODES_FIELDS = {
     'Imp1': 9,
     # Imp2 is conditional (index 10 if present)
     # PrintType, ArrowLoc, PrintMarker follow after Imp2 or Imp1
-}
+})
 
-REACHES_FIELDS = {
+REACHES_FIELDS = MappingProxyType({
     'ReachNo': 0,
     'ReachName': 1,
     'FromNode': 2,
@@ -57,78 +72,278 @@ REACHES_FIELDS = {
     'SlopeOrTrans': 8,
     'Ncoords': 9,
     'Reserved': 10,
-}
+})
+
+# Section-scan states for the edit loop's small FSM
+_OUTSIDE, _IN_NODES, _IN_REACHES = 0, 1, 2
+
+# Reusable padding source: slicing a preallocated run of spaces avoids the
+# ljust() copy on every field replacement
+_SPACES = b' ' * 4096
+
+# Dedicated line recognizers, compiled once. Matching these is a single
+# C-level pass per line, replacing per-token int()/float() try/except
+# validation. re.ASCII keeps \d and \s byte-oriented.
+_NUM = rb'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
 
+# Node record: C <NodeNo:int> <X:num> <Y:num> ...
+_NODE_LINE_RE = re.compile(
+    rb'C[ \t]+[-+]?\d+[ \t]+' + _NUM + rb'[ \t]+' + _NUM + rb'(?:[ \t]|$)',
+    re.ASCII)
+
+# Reach header: C <ReachNo:int> <8 tokens> <Ncoords:int> ...
+_REACH_HEADER_RE = re.compile(
+    rb'C[ \t]+([-+]?\d+)(?:[ \t]+\S+){8}[ \t]+([-+]?\d+)(?:[ \t]|$)',
+    re.ASCII)
+
+# Bytes that can appear in a numeric token; used as the deletion table for
+# the translate()-based numeric check below
+_NUM_BYTES = b'0123456789+-.eE'
+
+
+def _is_numeric_token(token: bytes) -> bool:
+    """
+    Charset test for "numeric-looking" tokens: translate() deletes every
+    allowed byte in one C pass, so the result is empty iff the token
+    contains nothing else. No float object is built and no exception is
+    raised on the mismatch path.
+    """
+    return bool(token) and not token.translate(None, _NUM_BYTES)
+
+
+def _resolve_field(section: str, field_spec: str) -> int:
+    """
+    Resolve a field name or 1-based numeric token index to a 0-based
+    token index for the given section.
+
+    Raises:
+        ValueError: If the section or field is unknown, or the index < 1
+    """
+    if field_spec.isdigit():
+        # User provided 1-based index, convert to 0-based
+        token_index = int(field_spec) - 1
+        if token_index < 0:
+            raise ValueError("Token index must be >= 1")
+        return token_index
 
-def detect_line_ending(content: bytes) -> str:
-    """Detect the line ending style used in the file (CRLF or LF)."""
-    if b'\r\n' in content:
-        return '\r\n'
-    return '\n'
+    # Look up field name
+    if section.upper() == 'NODES':
+        if field_spec not in NODES_FIELDS:
+            raise ValueError(f"Unknown NODES field: {field_spec}. Valid fields: {', '.join(NODES_FIELDS.keys())}")
+        return NODES_FIELDS[field_spec]
+    if section.upper() == 'REACHES':
+        if field_spec not in REACHES_FIELDS:
+            raise ValueError(f"Unknown REACHES field: {field_spec}. Valid fields: {', '.join(REACHES_FIELDS.keys())}")
+        return REACHES_FIELDS[field_spec]
+    raise ValueError(f"Invalid section: {section}. Must be NODES or REACHES")
 
 
-def find_token_positions(line: str) -> List[Tuple[int, int, str]]:
+def find_token_positions(line: bytes) -> List[Tuple[int, int, bytes]]:
     """
-    Find the exact character positions of all tokens in a line.
+    Find the exact byte positions of all tokens in a line.
 
     Returns a list of (start_pos, end_pos, token_value) tuples.
     The span from start_pos to end_pos represents the field's allocation
     including trailing spaces up to the next token.
     """
     # Skip the leading 'C' and any following space
-    if not line.startswith('C'):
+    if not line.startswith(b'C'):
         return []
 
-    content_after_c = line[1:]  # Everything after 'C'
+    # Manual whitespace scan: for the short ASCII lines in .catg files this
+    # runs entirely in CPython's C string fast paths, avoiding regex engine
+    # setup on every call
     tokens = []
+    n = len(line)
+    i = 1  # Skip the leading 'C'
+    while i < n:
+        # Skip whitespace to the start of the next token
+        while i < n and line[i] in b' \t\r\n':
+            i += 1
+        if i >= n:
+            break
+        j = i
+        while j < n and line[j] not in b' \t\r\n':
+            j += 1
+        tokens.append((i, j, line[i:j]))
+        i = j
 
-    # Find all tokens using regex to capture their positions
-    # Match non-whitespace sequences
-    for match in re.finditer(r'\S+', content_after_c):
-        token_value = match.group()
-        start_in_content = match.start()
-        end_in_content = match.end()
+    return tokens
 
-        # Adjust positions to account for leading 'C'
-        start_pos = start_in_content + 1
-        end_pos = end_in_content + 1
 
-        tokens.append((start_pos, end_pos, token_value))
+def _field_span_for_index(line: bytes, idx: int,
+                          content_len: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Walk the line left to right and return the span of token idx without
+    materializing the full token list: stop as soon as the start of token
+    idx and the start of token idx+1 (or end of line) are known.
+    content_len is the line length excluding any trailing newline bytes.
 
-    return tokens
+    Returns (start_pos, end_pos, token_end) where token_end is where the
+    token itself stops, before any padding up to end_pos.
+    """
+    if not line.startswith(b'C'):
+        return None
+
+    n = len(line)
+    i = 1  # Skip the leading 'C'
+    count = 0
+    start_pos = -1
+    token_end = -1
+    while i < n:
+        # Skip whitespace to the start of the next token
+        while i < n and line[i] in b' \t\r\n':
+            i += 1
+        if i >= n:
+            break
+        if count == idx:
+            start_pos = i
+        elif count == idx + 1:
+            # The next token's start closes the span
+            return (start_pos, i, token_end)
+        count += 1
+        while i < n and line[i] not in b' \t\r\n':
+            i += 1
+        if count == idx + 1:
+            token_end = i
+
+    if start_pos < 0:
+        return None
 
+    # Last token - extend to end of line (excluding newline)
+    return (start_pos, content_len, token_end)
 
-def get_field_span(line: str, token_index: int) -> Optional[Tuple[int, int]]:
+
+def get_field_span(line: bytes, token_index: int,
+                   content_len: Optional[int] = None) -> Optional[Tuple[int, int, int]]:
     """
-    Get the character span (start, end) for a specific token by index.
+    Get the byte span (start, end) for a specific token by index.
     The span extends from the token's start to the next token's start
     (or end of line if it's the last token).
 
     Args:
         line: The line to analyze
         token_index: 0-based index of the token (after 'C')
+        content_len: Line length excluding trailing newline bytes; computed
+            on demand when not supplied. Callers that have already split
+            the line ending off should pass len(line) to skip the rstrip.
 
     Returns:
-        (start_pos, end_pos) tuple or None if token doesn't exist
+        (start_pos, end_pos, token_end) tuple or None if the token doesn't
+        exist; token_end marks where the token itself stops, before the
+        padding that runs up to end_pos
     """
-    tokens = find_token_positions(line)
+    if content_len is None:
+        content_len = len(line.rstrip(b'\r\n'))
+    return _field_span_for_index(line, token_index, content_len)
+
 
-    if token_index >= len(tokens):
+def _field_span_with_prefix(line: bytes, idx: int, content_len: int
+                            ) -> Optional[Tuple[Tuple[int, ...], int, int]]:
+    """
+    Variant of _field_span_for_index for the edit loops' span caches:
+    returns (starts, end_pos, token_end) where starts holds the start
+    column of every token up to and including token idx (so starts[-1]
+    is the span start). Caching the whole prefix lets _span_still_valid
+    confirm that the cached columns still address the same token ordinal,
+    not merely that some token occupies them.
+    """
+    if not line.startswith(b'C'):
         return None
 
-    start_pos = tokens[token_index][0]
+    n = len(line)
+    i = 1  # Skip the leading 'C'
+    count = 0
+    starts = []
+    token_end = -1
+    while i < n:
+        # Skip whitespace to the start of the next token
+        while i < n and line[i] in b' \t\r\n':
+            i += 1
+        if i >= n:
+            break
+        if count <= idx:
+            starts.append(i)
+        elif count == idx + 1:
+            # The next token's start closes the span
+            return (tuple(starts), i, token_end)
+        count += 1
+        while i < n and line[i] not in b' \t\r\n':
+            i += 1
+        if count == idx + 1:
+            token_end = i
+
+    if len(starts) <= idx:
+        return None
 
-    # End position is the start of the next token, or end of line
-    if token_index + 1 < len(tokens):
-        end_pos = tokens[token_index + 1][0]
-    else:
-        # Last token - extend to end of line (excluding newline)
-        end_pos = len(line.rstrip('\r\n'))
+    # Last token - extend to end of line (excluding newline)
+    return (tuple(starts), content_len, token_end)
 
-    return (start_pos, end_pos)
+
+def _span_still_valid(line: bytes, starts: Tuple[int, ...], end_pos: int,
+                      token_end: int) -> bool:
+    """
+    Check that a span cached from an earlier record still addresses the
+    same token ordinal on this line. starts holds the start column of
+    every token up to and including the target, so the check walks the
+    whole prefix: only blanks between 'C' and the first start, exactly
+    one token between consecutive starts, the target token stopping
+    exactly at token_end, and only padding from there to end_pos (the
+    next token's start or end of line). A line passes only when a full
+    re-tokenization would produce the identical span, so a record with a
+    different token count (e.g. a conditional Imp2) can never have the
+    edit land on the wrong field; any mismatch falls back to the full
+    span lookup. RORB/ArcRORB write fixed-width records, so the check
+    still passes for nearly every line.
+    """
+    n = len(line)
+    target = starts[-1]
+    first = starts[0]
+    if first < 1 or first >= n or token_end <= target or end_pos < token_end \
+            or end_pos > n:
+        return False
+    # Only blanks between 'C' and the first token
+    i = 1
+    while i < first:
+        if line[i] not in b' \t':
+            return False
+        i += 1
+    if line[first] in b' \t':
+        return False
+    # Exactly one token between consecutive cached starts
+    for next_start in starts[1:]:
+        if next_start >= n:
+            return False
+        while i < next_start and line[i] not in b' \t':
+            i += 1
+        if i == next_start:
+            # Token runs into the cached start with no gap
+            return False
+        while i < next_start and line[i] in b' \t':
+            i += 1
+        if i != next_start or line[i] in b' \t':
+            return False
+    # Target token: non-blank run stopping exactly at token_end
+    while i < token_end:
+        if line[i] in b' \t':
+            return False
+        i += 1
+    if token_end < n and line[token_end] not in b' \t':
+        return False
+    # Only padding to end_pos, which must start the next token or end
+    # the line
+    while i < end_pos:
+        if line[i] not in b' \t':
+            return False
+        i += 1
+    if end_pos < n and line[end_pos] in b' \t':
+        return False
+    return True
 
 
-def replace_field_in_span(line: str, start_pos: int, end_pos: int, new_value: str) -> str:
+def replace_field_in_span(line: bytes, start_pos: int, end_pos: int,
+                          new_value: bytes,
+                          token_end: Optional[int] = None) -> bytes:
     """
     Replace a field within its fixed span, preserving total span width.
 
@@ -137,6 +352,10 @@ def replace_field_in_span(line: str, start_pos: int, end_pos: int, new_value: st
         start_pos: Start of the field span
         end_pos: End of the field span (exclusive)
         new_value: New value to write
+        token_end: End of the old token within the span, if known; enables
+            a fast path for one-character values (the common PrintFlag=1
+            case) that only rewrites the old token's bytes and keeps the
+            original inter-field padding untouched
 
     Returns:
         Modified line with field replaced
@@ -149,20 +368,27 @@ def replace_field_in_span(line: str, start_pos: int, end_pos: int, new_value: st
     # Check if new value fits
     if len(new_value) > span_width:
         raise ValueError(
-            f"New value '{new_value}' (length {len(new_value)}) doesn't fit in "
-            f"span of width {span_width}"
+            f"New value '{new_value.decode('utf-8', 'replace')}' "
+            f"(length {len(new_value)}) doesn't fit in span of width {span_width}"
         )
 
-    # Create the replacement: new value + padding to maintain span width
-    replacement = new_value.ljust(span_width)
+    # Single-character fast path: overwrite only the old token's bytes and
+    # leave the padding after it exactly as it was
+    if token_end is not None and len(new_value) == 1 and token_end > start_pos:
+        pad_len = token_end - start_pos - 1
+        pad = _SPACES[:pad_len] if pad_len <= len(_SPACES) else b' ' * pad_len
+        return line[:start_pos] + new_value + pad + line[token_end:]
 
-    # Replace the span
-    new_line = line[:start_pos] + replacement + line[end_pos:]
+    # Pad with spaces to maintain span width; slice the preallocated run
+    # instead of allocating a padded copy of the value via ljust
+    pad_len = span_width - len(new_value)
+    pad = _SPACES[:pad_len] if pad_len <= len(_SPACES) else b' ' * pad_len
 
-    return new_line
+    # Replace the span
+    return line[:start_pos] + new_value + pad + line[end_pos:]
 
 
-def is_node_record_line(line: str) -> bool:
+def is_node_record_line(line: bytes) -> bool:
     """
     Check if a line is a valid node record line in #NODES block.
 
@@ -170,32 +396,26 @@ def is_node_record_line(line: str) -> bool:
     - First token after 'C' should be an integer (NodeNo)
     - Second and third tokens should be numeric (X, Y coordinates)
     """
-    if not line.startswith('C'):
+    if not line.startswith(b'C'):
         return False
 
-    tokens = find_token_positions(line)
-
-    # Need at least NodeNo, X, Y
-    if len(tokens) < 3:
+    # Cheap pre-filter: reject blank/comment lines before allocating any
+    # tokens. A record needs 'C ' followed by a number, so find the first
+    # non-blank character and check it can start one.
+    if len(line) < 6 or line[1:2] != b' ':
         return False
-
-    # Check if first token is integer (NodeNo)
-    try:
-        int(tokens[0][2])
-    except ValueError:
+    i = 2
+    n = len(line)
+    while i < n and line[i] in b' \t':
+        i += 1
+    if i >= n or line[i] not in b'+-0123456789':
         return False
 
-    # Check if second and third tokens are numeric (X, Y)
-    try:
-        float(tokens[1][2])
-        float(tokens[2][2])
-    except ValueError:
-        return False
+    # Single compiled match validates NodeNo, X and Y in one pass
+    return _NODE_LINE_RE.match(line) is not None
 
-    return True
 
-
-def is_reach_header_line(line: str, prev_coord_count: int) -> Tuple[bool, int]:
+def is_reach_header_line(line: bytes, prev_coord_count: int) -> Tuple[bool, int]:
     """
     Check if a line is a reach header line (not a coordinate line).
 
@@ -205,163 +425,507 @@ def is_reach_header_line(line: str, prev_coord_count: int) -> Tuple[bool, int]:
     Returns:
         (is_header, ncoords_if_header)
     """
-    if not line.startswith('C'):
+    if not line.startswith(b'C'):
         return False, 0
 
-    tokens = find_token_positions(line)
+    # Cheap pre-filter: reject blank/comment lines before allocating any
+    # tokens. A header needs 'C ' followed by an integer ReachNo, so find
+    # the first non-blank character and check it can start one.
+    if len(line) < 6 or line[1:2] != b' ':
+        return False, 0
+    i = 2
+    n = len(line)
+    while i < n and line[i] in b' \t':
+        i += 1
+    if i >= n or line[i] not in b'+-0123456789':
+        return False, 0
 
-    if len(tokens) < 10:  # Reach header should have at least 10 tokens
+    # Single compiled match enforces the shape (integer ReachNo, at least
+    # 10 tokens, integer Ncoords at index 9) and captures Ncoords directly
+    m = _REACH_HEADER_RE.match(line)
+    if m is None:
         return False, 0
 
     # Heuristic: If we're expecting coordinate lines (prev_coord_count > 0),
     # and the line has only numeric tokens, it's a coordinate line
     if prev_coord_count > 0:
-        # Check if all tokens are numeric (coordinate line)
-        all_numeric = True
-        for _, _, token in tokens:
-            try:
-                float(token)
-            except ValueError:
-                all_numeric = False
-                break
-
-        if all_numeric:
+        if all(_is_numeric_token(token)
+               for _, _, token in find_token_positions(line)):
             return False, 0
 
-    # Check for reach header pattern:
-    # - First token is integer (ReachNo)
-    # - Has mix of integers and strings
-    # - Token at index 9 should be integer (Ncoords)
-    try:
-        int(tokens[0][2])  # ReachNo
-        ncoords = int(tokens[9][2])  # Ncoords
-        return True, ncoords
-    except (ValueError, IndexError):
-        return False, 0
+    return True, int(m.group(2))
 
 
-def edit_catg_file(input_path: str, output_path: str, section: str,
-                   field_spec: str, new_value: str) -> int:
+@dataclass(frozen=True)
+class Edit:
     """
-    Edit a .catg file, modifying a specific field in all records of a section.
+    One field edit: replace the token at token_index with new_value in
+    every record of the section identified by section_kind (_IN_NODES or
+    _IN_REACHES).
+    """
+    section_kind: int
+    token_index: int
+    new_value: bytes
 
-    Args:
-        input_path: Path to input .catg file
-        output_path: Path to output .catg file
-        section: 'NODES' or 'REACHES'
-        field_spec: Field name or numeric token index (1-based for user, converted to 0-based)
-        new_value: New value to set
 
-    Returns:
-        Number of lines modified
+def _parse_edit_spec(spec: str) -> Edit:
     """
-    # Read the entire file in binary mode to preserve exact bytes
-    with open(input_path, 'rb') as f:
-        content = f.read()
+    Parse a CLI edit spec of the form SECTION:FIELD=VALUE, e.g.
+    'NODES:PrintFlag=1' or 'REACHES:6=1'.
 
-    # Detect line ending style
-    line_ending_bytes = detect_line_ending(content)
-    line_ending = line_ending_bytes
+    Raises:
+        ValueError: If the spec is malformed or names an unknown field
+    """
+    head, sep, value = spec.partition('=')
+    section, sep2, field = head.partition(':')
+    if not sep or not sep2 or not section or not field:
+        raise ValueError(
+            f"Invalid edit spec: {spec!r}. Expected SECTION:FIELD=VALUE")
+    if ' ' in value or '\t' in value:
+        raise ValueError(f"Invalid edit spec: {spec!r}. Value cannot contain whitespace")
+    section_upper = section.upper()
+    if section_upper not in ('NODES', 'REACHES'):
+        raise ValueError(f"Invalid section: {section}. Must be NODES or REACHES")
+    token_index = _resolve_field(section_upper, field)
+    section_kind = _IN_NODES if section_upper == 'NODES' else _IN_REACHES
+    return Edit(section_kind, token_index, value.encode('utf-8'))
+
+
+def _edit_nodes(mm, fout, edits: List[Edit]) -> int:
+    """
+    Specialized loop for NODES-only edits: no coordinate-line tracking and
+    no REACHES branch in the per-line path.
+    """
+    spans: List[Optional[Tuple[Tuple[int, ...], int, int]]] = [None] * len(edits)
+    modified_count = 0
+    in_nodes = False
+
+    size = len(mm)
+    pos = 0
+    line_num = 0
+    while pos < size:
+        line_num += 1
+        nl = mm.find(b'\n', pos)
+        if nl < 0:
+            raw = mm[pos:size]
+            pos = size
+        else:
+            raw = mm[pos:nl + 1]
+            pos = nl + 1
+
+        # Split the line ending off so the edit logic sees bare content
+        if raw.endswith(b'\r\n'):
+            eol = b'\r\n'
+            line = raw[:-2]
+        elif raw.endswith(b'\n'):
+            eol = b'\n'
+            line = raw[:-1]
+        else:
+            eol = b''
+            line = raw
 
-    # Decode to string for processing
-    text = content.decode('utf-8', errors='replace')
-    lines = text.split('\n') if '\n' in text else [text]
+        modified_line = line
 
-    # Handle CRLF: remove \r from line ends
-    if '\r\n' in text:
-        lines = [line.rstrip('\r') for line in text.split('\n')]
+        # Track section boundaries; section headers are never records,
+        # so they skip record detection entirely
+        if line.startswith(b'C #'):
+            in_nodes = line.startswith(b'C #NODES')
+            # Column layout can change between sections
+            spans = [None] * len(edits)
+
+        elif in_nodes and is_node_record_line(line):
+            for k, edit in enumerate(edits):
+                span = spans[k]
+                if span is None or not _span_still_valid(
+                        modified_line, span[0], span[1], span[2]):
+                    span = _field_span_with_prefix(
+                        modified_line, edit.token_index, len(modified_line))
+                    spans[k] = span
+                if span:
+                    try:
+                        modified_line = replace_field_in_span(
+                            modified_line, span[0][-1], span[1],
+                            edit.new_value, span[2])
+                        modified_count += 1
+                    except ValueError as e:
+                        print(f"ERROR on line {line_num}: {e}", file=sys.stderr)
+                        print(f"  Line: {line[:80].decode('utf-8', 'replace')}...", file=sys.stderr)
+                        sys.exit(1)
+
+        fout.write(modified_line + eol)
 
-    # Determine target token index
-    if field_spec.isdigit():
-        # User provided 1-based index, convert to 0-based
-        token_index = int(field_spec) - 1
-        if token_index < 0:
-            raise ValueError("Token index must be >= 1")
-    else:
-        # Look up field name
-        if section.upper() == 'NODES':
-            if field_spec not in NODES_FIELDS:
-                raise ValueError(f"Unknown NODES field: {field_spec}. Valid fields: {', '.join(NODES_FIELDS.keys())}")
-            token_index = NODES_FIELDS[field_spec]
-        elif section.upper() == 'REACHES':
-            if field_spec not in REACHES_FIELDS:
-                raise ValueError(f"Unknown REACHES field: {field_spec}. Valid fields: {', '.join(REACHES_FIELDS.keys())}")
-            token_index = REACHES_FIELDS[field_spec]
+    return modified_count
+
+
+def _edit_reaches(mm, fout, edits: List[Edit]) -> int:
+    """
+    Specialized loop for REACHES-only edits: coordinate-line skipping but
+    no NODES branch in the per-line path.
+    """
+    spans: List[Optional[Tuple[Tuple[int, ...], int, int]]] = [None] * len(edits)
+    modified_count = 0
+    coord_lines_remaining = 0  # Track coordinate lines to skip
+    in_reaches = False
+
+    size = len(mm)
+    pos = 0
+    line_num = 0
+    while pos < size:
+        line_num += 1
+        nl = mm.find(b'\n', pos)
+        if nl < 0:
+            raw = mm[pos:size]
+            pos = size
+        else:
+            raw = mm[pos:nl + 1]
+            pos = nl + 1
+
+        # Split the line ending off so the edit logic sees bare content
+        if raw.endswith(b'\r\n'):
+            eol = b'\r\n'
+            line = raw[:-2]
+        elif raw.endswith(b'\n'):
+            eol = b'\n'
+            line = raw[:-1]
         else:
-            raise ValueError(f"Invalid section: {section}. Must be NODES or REACHES")
+            eol = b''
+            line = raw
+
+        modified_line = line
+
+        # Track section boundaries; section headers are never records,
+        # so they skip record detection entirely
+        if line.startswith(b'C #'):
+            in_reaches = line.startswith(b'C #REACHES')
+            coord_lines_remaining = 0
+            # Column layout can change between sections
+            spans = [None] * len(edits)
+
+        elif in_reaches:
+            # Edit reach header lines only, skip coordinate lines
+            if coord_lines_remaining > 0:
+                coord_lines_remaining -= 1
+            else:
+                is_header, ncoords = is_reach_header_line(line, coord_lines_remaining)
+                if is_header:
+                    for k, edit in enumerate(edits):
+                        span = spans[k]
+                        if span is None or not _span_still_valid(
+                                modified_line, span[0], span[1], span[2]):
+                            span = _field_span_with_prefix(
+                                modified_line, edit.token_index,
+                                len(modified_line))
+                            spans[k] = span
+                        if span:
+                            try:
+                                modified_line = replace_field_in_span(
+                                    modified_line, span[0][-1], span[1],
+                                    edit.new_value, span[2])
+                                modified_count += 1
+                            except ValueError as e:
+                                print(f"ERROR on line {line_num}: {e}", file=sys.stderr)
+                                print(f"  Line: {line[:80].decode('utf-8', 'replace')}...", file=sys.stderr)
+                                sys.exit(1)
+                    # Expect 2 coordinate lines after this header
+                    coord_lines_remaining = 2
+
+        fout.write(modified_line + eol)
+
+    return modified_count
 
-    # Process lines
+
+def _edit_mixed(mm, fout, nodes_edits: List[Edit],
+                reaches_edits: List[Edit]) -> int:
+    """
+    Combined loop for batches that touch both sections in one pass; keeps
+    the full section state machine.
+    """
+    nodes_spans: List[Optional[Tuple[Tuple[int, ...], int, int]]] = \
+        [None] * len(nodes_edits)
+    reaches_spans: List[Optional[Tuple[Tuple[int, ...], int, int]]] = \
+        [None] * len(reaches_edits)
     modified_count = 0
-    in_target_section = False
-    output_lines = []
     coord_lines_remaining = 0  # For REACHES: track coordinate lines to skip
+    section_state = _OUTSIDE
+
+    size = len(mm)
+    pos = 0
+    line_num = 0
+    while pos < size:
+        line_num += 1
+        nl = mm.find(b'\n', pos)
+        if nl < 0:
+            raw = mm[pos:size]
+            pos = size
+        else:
+            raw = mm[pos:nl + 1]
+            pos = nl + 1
+
+        # Split the line ending off so the edit logic sees bare content
+        if raw.endswith(b'\r\n'):
+            eol = b'\r\n'
+            line = raw[:-2]
+        elif raw.endswith(b'\n'):
+            eol = b'\n'
+            line = raw[:-1]
+        else:
+            eol = b''
+            line = raw
 
-    for line_num, line in enumerate(lines, 1):
         modified_line = line
 
-        # Track section boundaries
-        if line.startswith('C #NODES'):
-            in_target_section = (section.upper() == 'NODES')
-        elif line.startswith('C #REACHES'):
-            in_target_section = (section.upper() == 'REACHES')
-            coord_lines_remaining = 0
-        elif line.startswith('C #'):
-            in_target_section = False
+        # Track section boundaries; section headers are never records,
+        # so they skip record detection entirely
+        if line.startswith(b'C #'):
+            if line.startswith(b'C #NODES'):
+                section_state = _IN_NODES
+            elif line.startswith(b'C #REACHES'):
+                section_state = _IN_REACHES
+            else:
+                section_state = _OUTSIDE
             coord_lines_remaining = 0
-
-        # Edit lines in target section
-        if in_target_section:
-            if section.upper() == 'NODES':
-                # Edit node record lines
-                if is_node_record_line(line):
-                    span = get_field_span(line, token_index)
+            # Column layout can change between sections
+            nodes_spans = [None] * len(nodes_edits)
+            reaches_spans = [None] * len(reaches_edits)
+
+        # Edit node record lines
+        elif section_state == _IN_NODES:
+            if is_node_record_line(line):
+                for k, edit in enumerate(nodes_edits):
+                    span = nodes_spans[k]
+                    if span is None or not _span_still_valid(
+                            modified_line, span[0], span[1], span[2]):
+                        span = _field_span_with_prefix(
+                            modified_line, edit.token_index,
+                            len(modified_line))
+                        nodes_spans[k] = span
                     if span:
                         try:
-                            modified_line = replace_field_in_span(line, span[0], span[1], new_value)
+                            modified_line = replace_field_in_span(
+                                modified_line, span[0][-1], span[1],
+                                edit.new_value, span[2])
                             modified_count += 1
                         except ValueError as e:
                             print(f"ERROR on line {line_num}: {e}", file=sys.stderr)
-                            print(f"  Line: {line[:80]}...", file=sys.stderr)
+                            print(f"  Line: {line[:80].decode('utf-8', 'replace')}...", file=sys.stderr)
                             sys.exit(1)
 
-            elif section.upper() == 'REACHES':
-                # Edit reach header lines only, skip coordinate lines
-                if coord_lines_remaining > 0:
-                    # This is a coordinate line, skip it
-                    coord_lines_remaining -= 1
-                else:
-                    # Check if this is a reach header
-                    is_header, ncoords = is_reach_header_line(line, coord_lines_remaining)
-                    if is_header:
-                        span = get_field_span(line, token_index)
+        # Edit reach header lines only, skip coordinate lines
+        elif section_state == _IN_REACHES:
+            if coord_lines_remaining > 0:
+                # This is a coordinate line, skip it
+                coord_lines_remaining -= 1
+            else:
+                # Check if this is a reach header
+                is_header, ncoords = is_reach_header_line(line, coord_lines_remaining)
+                if is_header:
+                    for k, edit in enumerate(reaches_edits):
+                        span = reaches_spans[k]
+                        if span is None or not _span_still_valid(
+                                modified_line, span[0], span[1], span[2]):
+                            span = _field_span_with_prefix(
+                                modified_line, edit.token_index,
+                                len(modified_line))
+                            reaches_spans[k] = span
                         if span:
                             try:
-                                modified_line = replace_field_in_span(line, span[0], span[1], new_value)
+                                modified_line = replace_field_in_span(
+                                    modified_line, span[0][-1], span[1],
+                                    edit.new_value, span[2])
                                 modified_count += 1
-                                # Expect 2 coordinate lines after this header
-                                coord_lines_remaining = 2
                             except ValueError as e:
                                 print(f"ERROR on line {line_num}: {e}", file=sys.stderr)
-                                print(f"  Line: {line[:80]}...", file=sys.stderr)
+                                print(f"  Line: {line[:80].decode('utf-8', 'replace')}...", file=sys.stderr)
                                 sys.exit(1)
+                    # Expect 2 coordinate lines after this header
+                    coord_lines_remaining = 2
 
-        output_lines.append(modified_line)
+        fout.write(modified_line + eol)
 
-    # Write output file with original line endings
-    output_text = line_ending.join(output_lines)
+    return modified_count
 
-    # Preserve the exact ending of the original file
-    if text.endswith('\n') and not output_text.endswith('\n'):
-        output_text += line_ending.rstrip('\r')
-    elif text.endswith('\r\n') and not output_text.endswith('\r\n'):
-        output_text += line_ending
 
-    with open(output_path, 'wb') as f:
-        f.write(output_text.encode('utf-8'))
+def edit_catg_file_batch(input_path: str, output_path: str,
+                         edits: List[Edit]) -> int:
+    """
+    Apply several field edits to a .catg file in one streaming pass.
+
+    Each edit targets one field in all records of its section, so users
+    issuing multiple edits pay a single read and a single write instead
+    of one full-file rewrite per edit. Thin dispatcher: single-section
+    batches run a specialized loop with no dead branches in the per-line
+    path; mixed batches run the combined loop.
+
+    Args:
+        input_path: Path to input .catg file
+        output_path: Path to output .catg file
+        edits: Edits to apply; any mix of NODES and REACHES targets
+
+    Returns:
+        Number of field replacements applied
+    """
+    # Group edits by section once; span replacement preserves width, so the
+    # edits within a line can be applied in any order
+    nodes_edits = [e for e in edits if e.section_kind == _IN_NODES]
+    reaches_edits = [e for e in edits if e.section_kind == _IN_REACHES]
+
+    # Write to a temporary file next to the output and move it into place
+    # only on success: editing a file onto itself works (the input stays
+    # intact while it is being read), and a failed run never leaves a
+    # truncated or half-written output behind
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix='.catg-edit-')
+    try:
+        modified_count = 0
+        with open(input_path, 'rb') as fin, \
+                open(tmp_fd, 'wb', buffering=1 << 20) as fout:
+            # Map the file instead of read()ing it: no file-sized bytes
+            # object, no kernel-to-userspace copy, and repeated edits of the
+            # same file run straight out of the page cache
+            try:
+                mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped; the output is empty too
+                mm = None
+
+            if mm is not None:
+                try:
+                    # Hint the kernel to read ahead aggressively (Linux only)
+                    if hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                    if not reaches_edits:
+                        modified_count = _edit_nodes(mm, fout, nodes_edits)
+                    elif not nodes_edits:
+                        modified_count = _edit_reaches(mm, fout, reaches_edits)
+                    else:
+                        modified_count = _edit_mixed(mm, fout, nodes_edits,
+                                                     reaches_edits)
+                finally:
+                    mm.close()
+
+            # mkstemp creates the file 0600; match the input's permissions
+            os.chmod(tmp_path, os.stat(input_path).st_mode)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
     return modified_count
 
 
+def edit_catg_file(input_path: str, output_path: str, section: str,
+                   field_spec: str, new_value: str) -> int:
+    """
+    Edit a .catg file, modifying a specific field in all records of a section.
+
+    Args:
+        input_path: Path to input .catg file
+        output_path: Path to output .catg file
+        section: 'NODES' or 'REACHES'
+        field_spec: Field name or numeric token index (1-based for user, converted to 0-based)
+        new_value: New value to set
+
+    Returns:
+        Number of lines modified
+    """
+    # Resolve the target section and token index once
+    token_index = _resolve_field(section, field_spec)
+    section_upper = section.upper()
+    if section_upper not in ('NODES', 'REACHES'):
+        raise ValueError(f"Invalid section: {section}. Must be NODES or REACHES")
+    target_state = _IN_NODES if section_upper == 'NODES' else _IN_REACHES
+
+    # Encode the replacement value once
+    value_bytes = new_value.encode('utf-8')
+
+    # Bulk edits go through the C extension when it is built; it is kept in
+    # lockstep with the pure-Python loop, and test_script.sh diffs the two
+    # whenever the extension is present. The extension caps tokens per line,
+    # so very high field indices stay on the pure-Python path.
+    if _catg_edit is not None and token_index < 32:
+        with open(input_path, 'rb') as fin:
+            content = fin.read()
+        edited, modified_count = _catg_edit.edit_stream(
+            content, token_index, value_bytes, target_state)
+        with open(output_path, 'wb') as fout:
+            fout.write(edited)
+        return modified_count
+
+    return edit_catg_file_batch(
+        input_path, output_path,
+        [Edit(target_state, token_index, value_bytes)])
+
+
+def edit_catg_dir(input_dir: str, output_dir: str, pattern: str,
+                  workers: Optional[int], edits: List[Edit]) -> int:
+    """
+    Apply the same edits to every matching .catg file in a directory,
+    fanning the files out across a process pool. Each file is independent,
+    so batch calibration workflows scale with core count.
+
+    Args:
+        input_dir: Directory containing input .catg files
+        output_dir: Directory for edited files (created if missing);
+            output file names mirror the input names
+        pattern: Glob pattern for selecting input files, e.g. '*.catg'
+        workers: Worker process count (None uses os.cpu_count())
+        edits: Edits to apply to each file
+
+    Returns:
+        Total number of field replacements across all files
+
+    Raises:
+        ValueError: If output_dir resolves to the same directory as
+            input_dir
+        FileNotFoundError: If no input files match the pattern
+        RuntimeError: If any file fails to process
+    """
+    # Refuse to write outputs over the inputs: every matched file would be
+    # overwritten in place, which batch workflows should never do silently
+    if os.path.realpath(input_dir) == os.path.realpath(output_dir):
+        raise ValueError(
+            f"Output directory {output_dir!r} is the same as the input "
+            f"directory; choose a different --output-dir")
+
+    input_files = sorted(glob.glob(os.path.join(input_dir, pattern)))
+    if not input_files:
+        raise FileNotFoundError(
+            f"No files matching {pattern!r} in {input_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    total_modified = 0
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for input_path in input_files:
+            output_path = os.path.join(output_dir, os.path.basename(input_path))
+            future = pool.submit(edit_catg_file_batch, input_path, output_path, edits)
+            futures[future] = input_path
+
+        # as_completed surfaces failures as soon as they happen instead of
+        # waiting for the whole pool to drain
+        for future in as_completed(futures):
+            input_path = futures[future]
+            try:
+                count = future.result()
+            except (Exception, SystemExit) as e:
+                print(f"ERROR processing {input_path}: {e}", file=sys.stderr)
+                failures.append(input_path)
+                continue
+            total_modified += count
+            print(f"{input_path}: {count} fields modified")
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} file(s) failed to process")
+
+    return total_modified
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Edit RORB .catg files while preserving exact spacing and formatting.',
@@ -380,6 +944,12 @@ Examples:
   # Use token index (1-based, counting tokens after 'C')
   %(prog)s input.catg output.catg --section NODES --field 6 --value 1
 
+  # Apply several edits in one pass
+  %(prog)s input.catg output.catg --edit NODES:PrintFlag=1 --edit REACHES:ReachType=2
+
+  # Edit every .catg file in a directory, in parallel
+  %(prog)s --input-dir scenarios --output-dir edited --section NODES --field PrintFlag --value 1
+
 Field names for NODES:
   NodeNo, X, Y, Size, NodeType, PrintFlag, DownstreamNode, Name, Area, Imp1
 
@@ -389,34 +959,92 @@ Field names for REACHES:
         """
     )
 
-    parser.add_argument('input', help='Input .catg file path')
-    parser.add_argument('output', help='Output .catg file path')
-    parser.add_argument('--section', required=True,
+    parser.add_argument('input', nargs='?', help='Input .catg file path')
+    parser.add_argument('output', nargs='?', help='Output .catg file path')
+    parser.add_argument('--section',
                         choices=['NODES', 'REACHES', 'nodes', 'reaches'],
                         help='Section to edit (NODES or REACHES)')
-    parser.add_argument('--field', required=True,
+    parser.add_argument('--field',
                         help='Field name or token index (1-based, after "C")')
-    parser.add_argument('--value', required=True,
+    parser.add_argument('--value',
                         help='New value to set (no whitespace allowed)')
+    parser.add_argument('--edit', action='append', metavar='SECTION:FIELD=VALUE',
+                        help='Edit to apply, e.g. NODES:PrintFlag=1; repeatable, '
+                             'all edits are applied in a single pass '
+                             '(alternative to --section/--field/--value)')
+    parser.add_argument('--input-dir',
+                        help='Process every matching file in this directory '
+                             'instead of a single input file')
+    parser.add_argument('--output-dir',
+                        help='Directory for edited files in --input-dir mode '
+                             '(created if missing)')
+    parser.add_argument('--pattern', default='*.catg',
+                        help="Glob pattern for --input-dir mode (default: '*.catg')")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --input-dir mode '
+                             '(default: number of CPUs)')
 
     args = parser.parse_args()
 
+    batch_dirs = bool(args.input_dir or args.output_dir)
+    if batch_dirs:
+        if not (args.input_dir and args.output_dir):
+            print("ERROR: --input-dir and --output-dir must be used together",
+                  file=sys.stderr)
+            sys.exit(1)
+        if args.input or args.output:
+            print("ERROR: --input-dir mode cannot be combined with single "
+                  "input/output paths", file=sys.stderr)
+            sys.exit(1)
+    elif not (args.input and args.output):
+        print("ERROR: Input and output paths are required (or use "
+              "--input-dir/--output-dir)", file=sys.stderr)
+        sys.exit(1)
+
+    if args.edit:
+        if args.section or args.field or args.value:
+            print("ERROR: --edit cannot be combined with --section/--field/--value",
+                  file=sys.stderr)
+            sys.exit(1)
+    elif not (args.section and args.field and args.value):
+        print("ERROR: Either --edit or all of --section, --field and --value "
+              "are required", file=sys.stderr)
+        sys.exit(1)
+
     # Validate that value contains no whitespace
-    if ' ' in args.value or '\t' in args.value:
+    if args.value and (' ' in args.value or '\t' in args.value):
         print("ERROR: Value cannot contain whitespace", file=sys.stderr)
         sys.exit(1)
 
     try:
-        modified_count = edit_catg_file(
-            args.input,
-            args.output,
-            args.section.upper(),
-            args.field,
-            args.value
-        )
+        if args.edit:
+            edits = [_parse_edit_spec(spec) for spec in args.edit]
+        else:
+            edits = [_parse_edit_spec(
+                f"{args.section.upper()}:{args.field}={args.value}")]
+
+        if batch_dirs:
+            total = edit_catg_dir(args.input_dir, args.output_dir,
+                                  args.pattern, args.workers, edits)
 
-        print(f"Successfully modified {modified_count} lines in {args.section.upper()} section.")
-        print(f"Output written to: {args.output}")
+            print(f"Successfully applied {total} field edits.")
+            print(f"Output written to: {args.output_dir}")
+        elif args.edit:
+            modified_count = edit_catg_file_batch(args.input, args.output, edits)
+
+            print(f"Successfully applied {modified_count} field edits.")
+            print(f"Output written to: {args.output}")
+        else:
+            modified_count = edit_catg_file(
+                args.input,
+                args.output,
+                args.section.upper(),
+                args.field,
+                args.value
+            )
+
+            print(f"Successfully modified {modified_count} lines in {args.section.upper()} section.")
+            print(f"Output written to: {args.output}")
 
     except FileNotFoundError as e:
         print(f"ERROR: {e}", file=sys.stderr)
@@ -424,6 +1052,9 @@ Field names for REACHES:
     except ValueError as e:
         print(f"ERROR: {e}", file=sys.stderr)
         sys.exit(1)
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"UNEXPECTED ERROR: {e}", file=sys.stderr)
         import traceback
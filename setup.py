@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Build script for the optional C accelerator.
+
+The editor works without it; building is purely a speed-up for bulk
+edits over large .catg collections:
+
+    pip install cython
+    python3 setup.py build_ext --inplace
+"""
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name='rorb-catg-edit',
+    ext_modules=cythonize(
+        [Extension('_catg_edit', ['_catg_edit.pyx'])],
+        language_level=3,
+    ),
+)
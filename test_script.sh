@@ -106,6 +106,99 @@ else
 fi
 echo ""
 
+# Test 9: C extension matches the pure-Python loop (skipped if not built)
+echo -e "${BLUE}Test 9: C extension output matches pure-Python output${NC}"
+if python3 -c "import _catg_edit" 2>/dev/null; then
+    # edit_catg_file routes through the extension when it is importable;
+    # edit_catg_file_batch always runs the pure-Python loop
+    python3 - <<'EOF'
+import rorb_catg_edit as m
+
+for section, field, value in [('NODES', 'PrintFlag', '1'),
+                              ('REACHES', 'ReachType', '2')]:
+    m.edit_catg_file('example/sample.catg', 'test_ext.catg',
+                     section, field, value)
+    kind = m._IN_NODES if section == 'NODES' else m._IN_REACHES
+    fields = m.NODES_FIELDS if section == 'NODES' else m.REACHES_FIELDS
+    m.edit_catg_file_batch('example/sample.catg', 'test_pure.catg',
+                           [m.Edit(kind, fields[field], value.encode())])
+    ext = open('test_ext.catg', 'rb').read()
+    pure = open('test_pure.catg', 'rb').read()
+    assert ext == pure, f"extension and pure-Python outputs differ for {section}:{field}"
+EOF
+    echo "Extension output is byte-identical to pure-Python output"
+else
+    echo "Extension not built - skipped (run: python3 setup.py build_ext --inplace)"
+fi
+echo -e "${GREEN}✓ Test 9 passed${NC}"
+echo ""
+
+# Test 10: Batch --edit matches sequential single edits
+echo -e "${BLUE}Test 10: Batch --edit matches sequential single edits${NC}"
+python3 rorb_catg_edit.py example/sample.catg test_batch.catg \
+  --edit NODES:PrintFlag=1 \
+  --edit REACHES:ReachType=2
+python3 rorb_catg_edit.py example/sample.catg test_seq1.catg \
+  --section NODES --field PrintFlag --value 1
+python3 rorb_catg_edit.py test_seq1.catg test_seq2.catg \
+  --section REACHES --field ReachType --value 2
+if cmp -s test_batch.catg test_seq2.catg; then
+    echo "Single-pass batch output matches two sequential edits"
+    echo -e "${GREEN}✓ Test 10 passed${NC}"
+else
+    echo "ERROR: Batch --edit output differs from sequential edits!"
+    exit 1
+fi
+echo ""
+
+# Test 11: Directory mode
+echo -e "${BLUE}Test 11: Directory mode (--input-dir/--output-dir)${NC}"
+rm -rf test_batch_in test_batch_out
+mkdir -p test_batch_in
+cp example/sample.catg test_batch_in/
+python3 rorb_catg_edit.py \
+  --input-dir test_batch_in --output-dir test_batch_out \
+  --section NODES --field PrintFlag --value 1
+if cmp -s test_batch_out/sample.catg test_nodes_printflag.catg; then
+    echo "Directory-mode output matches the single-file output"
+    echo -e "${GREEN}✓ Test 11 passed${NC}"
+else
+    echo "ERROR: Directory-mode output differs from single-file output!"
+    exit 1
+fi
+echo ""
+
+# Test 12: Error handling - malformed --edit spec
+echo -e "${BLUE}Test 12: Error handling - malformed --edit spec${NC}"
+if python3 rorb_catg_edit.py example/sample.catg test_error.catg \
+  --edit BADSPEC 2>&1 | grep -q "Invalid edit spec"; then
+    echo "Correctly caught malformed edit spec"
+    echo -e "${GREEN}✓ Test 12 passed${NC}"
+else
+    echo "ERROR: Did not catch malformed edit spec"
+    exit 1
+fi
+echo ""
+
+# Test 13: Error handling - same input and output directory
+echo -e "${BLUE}Test 13: Error handling - same input and output directory${NC}"
+if python3 rorb_catg_edit.py \
+  --input-dir test_batch_in --output-dir test_batch_in \
+  --section NODES --field PrintFlag --value 1 2>&1 \
+  | grep -q "same as the input"; then
+    if cmp -s test_batch_in/sample.catg example/sample.catg; then
+        echo "Correctly refused to overwrite the input directory"
+        echo -e "${GREEN}✓ Test 13 passed${NC}"
+    else
+        echo "ERROR: Input files were modified!"
+        exit 1
+    fi
+else
+    echo "ERROR: Did not refuse identical input and output directories"
+    exit 1
+fi
+echo ""
+
 echo "=================================="
 echo -e "${GREEN}All tests passed! ✓${NC}"
 echo "=================================="
@@ -115,6 +208,8 @@ echo "  - test_nodes_printflag.catg"
 echo "  - test_reaches_printflag.catg"
 echo "  - test_reaches_type.catg"
 echo "  - test_nodes_index.catg"
+echo "  - test_batch.catg (and sequential-edit comparisons)"
+echo "  - test_batch_out/ (directory-mode output)"
 echo ""
 echo "To clean up test files, run:"
-echo "  rm test_*.catg"
+echo "  rm -rf test_*.catg test_batch_in test_batch_out"